@@ -1,9 +1,12 @@
 import pygame
-import random
 import math
+import bisect
+import functools
+import itertools
 import numpy as np
-from colormath.color_objects import sRGBColor, LCHabColor
-from colormath.color_conversions import convert_color
+from dataclasses import dataclass
+
+from physics import collide_players
 
 
 # --- Game Settings ---
@@ -24,6 +27,7 @@ SPEED_MULTIPLIER = 5.0
 # Food settings
 MAX_FOOD = 1000
 FOOD_SPAWN_RATE = 0.3
+FOOD_RADIUS = 3
 
 # Visuals
 FOOD_COLOR = (200, 200, 200)
@@ -37,26 +41,43 @@ VICTORY_OVERLAY_COLOR = (25, 25, 25, 200) # Dark, semi-transparent
 CURSOR_BLINK_RATE = 500 # Milliseconds
 
 # --- Helper Functions ---
-def get_distance(x1, y1, x2, y2):
-    return math.sqrt((x2 - x1)**2 + (y2 - y1)**2)
-
 def generate_distinct_colors(num_teams):
-    colors_rgb_list = []
-    
-    for i in range(num_teams):
-        hue = i * (360.0 / num_teams)
-        lightness = 70.0 if i % 2 == 0 else 55.0
-        chroma = 60.0
-        lch_color = LCHabColor(lightness, chroma, hue)
-        rgb_color = convert_color(lch_color, sRGBColor)
-        
-        r_int = int(rgb_color.clamped_rgb_r * 255)
-        g_int = int(rgb_color.clamped_rgb_g * 255)
-        b_int = int(rgb_color.clamped_rgb_b * 255)
-        
-        colors_rgb_list.append((r_int, g_int, b_int))
-    
-    return np.array(colors_rgb_list, dtype=np.uint8)
+    """Evenly-spaced LCHab hues converted to sRGB, vectorized over all
+    teams at once (closed-form LCHab -> Lab -> XYZ -> sRGB)."""
+    i = np.arange(num_teams)
+    hue = np.radians(i * (360.0 / num_teams))
+    lightness = np.where(i % 2 == 0, 70.0, 55.0)
+    chroma = 60.0
+
+    # LCHab -> Lab
+    a = chroma * np.cos(hue)
+    b = chroma * np.sin(hue)
+
+    # Lab -> XYZ (D50 reference white, matching the old colormath default)
+    fy = (lightness + 16.0) / 116.0
+    fxyz = np.stack([fy + a / 500.0, fy, fy - b / 200.0], axis=1)
+    xyz = np.where(fxyz ** 3 > 0.008856, fxyz ** 3, (fxyz - 16.0 / 116.0) / 7.787)
+    xyz *= (0.96422, 1.0, 0.82521)
+
+    # XYZ -> linear sRGB (D50-adapted matrix)
+    m = np.array([[ 3.1338561, -1.6168667, -0.4906146],
+                  [-0.9787684,  1.9161415,  0.0334540],
+                  [ 0.0719453, -0.2289914,  1.4052427]])
+    linear = xyz @ m.T
+
+    # Linear -> gamma-encoded sRGB
+    linear = np.clip(linear, 0.0, None)
+    srgb = np.where(linear <= 0.0031308,
+                    12.92 * linear,
+                    1.055 * linear ** (1.0 / 2.4) - 0.055)
+    srgb = np.clip(srgb, 0.0, 1.0)
+
+    return (srgb * 255).astype(np.uint8)
+
+# Computed once at startup: plain tuples indexed by team_id, passed
+# straight to pygame/scoreboard code so the draw path never converts
+# per frame.
+TEAM_COLORS = tuple(tuple(int(v) for v in c) for c in generate_distinct_colors(NUM_TEAMS))
 
 def parse_speed_input(input_str):
     """Tries to parse float from string, validates, and returns new speed and formatted text."""
@@ -83,79 +104,249 @@ def parse_speed_input(input_str):
 def get_cursor_pos_from_click(font, text, click_x, box_inner_x):
     """Finds the text index for a mouse click."""
     relative_click_x = click_x - box_inner_x
-    
-    # Find the width of each substring
-    widths = [font.size(text[:i])[0] for i in range(len(text) + 1)]
-    
-    # Find where the click lands
-    for i in range(len(widths)):
-        if i == len(widths) - 1:
-            # Click is past the end of the text
-            return len(text)
-            
-        # Find the midpoint between this char's end and the next char's end
-        midpoint = (widths[i] + widths[i+1]) / 2
-        
-        if relative_click_x < midpoint:
-            return i
-            
-    return len(text) # Fallback
-
-
-# --- Player Class ---
-class Player:
-    def __init__(self, x, y, team_id, color, start_mass):
-        self.x = x
-        self.y = y
-        self.team_id = team_id
-        self.color = color
-        self.mass = start_mass
-        self.radius = 0
-        self.speed = 0
-        self.update_properties()
-        
-        self.move_timer = 0
-        self.dx = 0
-        self.dy = 0
 
-    def update_properties(self):
-        self.radius = int(math.sqrt(self.mass) * 4)
-        self.speed = SPEED_MULTIPLIER * max(0.5, 8 - self.radius * 0.1)
+    # Cumulative prefix widths from one font.size call per character
+    # (O(n), vs re-measuring every prefix; per-char widths are exact for
+    # the digits and '.' this box accepts)
+    prefix = [0]
+    prefix.extend(itertools.accumulate(font.size(ch)[0] for ch in text))
+
+    # The cursor lands after every character whose midpoint is left of
+    # the click
+    midpoints = [(prefix[i] + prefix[i + 1]) / 2 for i in range(len(text))]
+    return bisect.bisect_right(midpoints, relative_click_x)
+
+
+# SysFont loading hits the disk, so keep the loaded faces cached at
+# module scope where restarts can reuse them
+_FONTS = {}
+
+def get_font(size, bold=False):
+    key = (size, bold)
+    font = _FONTS.get(key)
+    if font is None:
+        font = pygame.font.SysFont(None, size, bold=bold)
+        _FONTS[key] = font
+    return font
+
+
+@functools.lru_cache(maxsize=512)
+def render_text(font, text, color):
+    """Memoized font.render; most of the UI strings repeat frame after
+    frame, so only genuinely new text pays for rasterization."""
+    return font.render(text, True, color)
+
+
+# Lazily pre-rendered filled-circle sprites for players, keyed by
+# (team_id, radius). Radii move in coarse integer steps, so the cache
+# stays small and blitting replaces per-frame circle rasterization.
+_player_sprite_cache = {}
+
+def get_player_sprite(team_id, radius):
+    key = (team_id, radius)
+    sprite = _player_sprite_cache.get(key)
+    if sprite is None:
+        size = 2 * radius + 1
+        sprite = pygame.Surface((size, size), pygame.SRCALPHA)
+        pygame.draw.circle(sprite, TEAM_COLORS[team_id], (radius, radius), radius)
+        _player_sprite_cache[key] = sprite
+    return sprite
+
+
+# Single Generator for all randomness: vectorized draws through the new
+# numpy Generator API are both faster and cheaper to call than the
+# legacy np.random.* module-level functions.
+rng = np.random.default_rng()
+
+# Precomputed unit vectors for direction rerolls: 1024 headings are
+# visually indistinguishable from continuous angles for a random walk,
+# and picking from the table skips the per-reroll cos/sin.
+_DIR_ANGLES = np.linspace(0, 2 * math.pi, 1024, endpoint=False)
+DIRS = np.stack([np.cos(_DIR_ANGLES), np.sin(_DIR_ANGLES)], axis=1).astype(np.float32)
+
+# Masses are always whole numbers (START_MASS plus sums of pellet and
+# player masses), so radius and speed can be table lookups indexed by
+# mass instead of per-update sqrt/max chains. The table comfortably
+# covers the total mass a round can accumulate; lookups clamp to the
+# last entry just in case.
+_MAX_TABLE_MASS = 100_000
+RADIUS_TABLE = (np.sqrt(np.arange(_MAX_TABLE_MASS)) * 4).astype(np.int32)
+SPEED_TABLE = (SPEED_MULTIPLIER * np.maximum(0.5, 8 - RADIUS_TABLE * 0.1)).astype(np.float32)
+
+
+# --- Player State (Structure-of-Arrays) ---
+@dataclass
+class PlayerState:
+    """Parallel arrays holding one slot per player; dead slots keep their
+    index so the arrays stay contiguous and collisions/draws skip them via
+    the `alive` mask."""
+    x: np.ndarray
+    y: np.ndarray
+    mass: np.ndarray
+    radius: np.ndarray
+    speed: np.ndarray
+    dx: np.ndarray
+    dy: np.ndarray
+    move_timer: np.ndarray
+    team_id: np.ndarray
+    alive: np.ndarray
+
+    @classmethod
+    def spawn(cls):
+        n = NUM_TEAMS * PLAYERS_PER_TEAM
+        team_id = np.repeat(np.arange(NUM_TEAMS, dtype=np.int32), PLAYERS_PER_TEAM)
+        state = cls(
+            x=rng.integers(0, SCREEN_WIDTH + 1, n).astype(np.float32),
+            y=rng.integers(0, SCREEN_HEIGHT + 1, n).astype(np.float32),
+            mass=np.full(n, START_MASS, dtype=np.float32),
+            radius=np.zeros(n, dtype=np.int32),
+            speed=np.zeros(n, dtype=np.float32),
+            dx=np.zeros(n, dtype=np.float32),
+            dy=np.zeros(n, dtype=np.float32),
+            move_timer=np.zeros(n, dtype=np.float32),
+            team_id=team_id,
+            alive=np.ones(n, dtype=bool),
+        )
+        state.update_properties()
+        return state
+
+    def update_properties(self, idx=None):
+        if idx is None:
+            idx = slice(None)
+        m = np.minimum(self.mass[idx].astype(np.int64), _MAX_TABLE_MASS - 1)
+        new_radius = RADIUS_TABLE[m]
+        new_speed = SPEED_TABLE[m]
+        # Radius grows in integer steps, so eating a single pellet
+        # usually leaves it unchanged; skip the writes when nothing moved.
+        # Speed is compared too because the collision kernel writes the
+        # grown radius in place, leaving only the speed out of date here.
+        if (np.array_equal(new_radius, self.radius[idx])
+                and np.array_equal(new_speed, self.speed[idx])):
+            return
+        self.radius[idx] = new_radius
+        self.speed[idx] = new_speed
 
     def move(self, game_speed):
-        # Apply game_speed to AI decision timer
-        self.move_timer -= 1 * game_speed
-        
-        if self.move_timer <= 0:
-            self.move_timer = random.randint(30, 90)
-            angle = random.uniform(0, 2 * math.pi)
-            self.dx = math.cos(angle)
-            self.dy = math.sin(angle)
-            
+        # Apply game_speed to the AI decision timers; reroll all expired
+        # directions in one vectorized pass
+        self.move_timer -= game_speed
+        reroll = self.move_timer <= 0
+        n_reroll = int(np.count_nonzero(reroll))
+        if n_reroll:
+            self.move_timer[reroll] = rng.integers(30, 91, n_reroll)
+            picks = rng.integers(0, len(DIRS), n_reroll)
+            self.dx[reroll] = DIRS[picks, 0]
+            self.dy[reroll] = DIRS[picks, 1]
+
         # Apply game_speed to movement
-        self.x += self.dx * self.speed * game_speed
-        self.y += self.dy * self.speed * game_speed
-        
-        self.x = max(0, min(self.x, SCREEN_WIDTH))
-        self.y = max(0, min(self.y, SCREEN_HEIGHT))
-
-    def draw(self, screen):
-        pygame.draw.circle(screen, self.color, (int(self.x), int(self.y)), self.radius)
-
-# --- Food Class ---
-class Food:
-    def __init__(self, x, y):
-        self.x = x
-        self.y = y
-        self.radius = 3
-        self.color = (
-            random.randint(200, 255),
-            random.randint(200, 255),
-            random.randint(200, 255)
+        step = self.speed * game_speed
+        self.x += self.dx * step
+        self.y += self.dy * step
+        np.clip(self.x, 0, SCREEN_WIDTH, out=self.x)
+        np.clip(self.y, 0, SCREEN_HEIGHT, out=self.y)
+
+
+# Shared pellet palette: the bright near-white shades pellets used to
+# roll per-channel, sampled once at startup. Pellets store an index into
+# this tuple, and each shade gets exactly one pre-rasterized sprite.
+FOOD_PALETTE = tuple(
+    tuple(int(v) for v in c)
+    for c in (rng.integers(200, 256, (64, 3)) & 0xF8)
+)
+
+
+# --- Food State (Structure-of-Arrays) ---
+@dataclass
+class FoodState:
+    """Fixed-capacity pellet arrays (MAX_FOOD slots) with a free-slot mask."""
+    x: np.ndarray
+    y: np.ndarray
+    color_id: np.ndarray
+    alive: np.ndarray
+
+    @classmethod
+    def empty(cls):
+        return cls(
+            x=np.zeros(MAX_FOOD, dtype=np.float32),
+            y=np.zeros(MAX_FOOD, dtype=np.float32),
+            color_id=np.zeros(MAX_FOOD, dtype=np.int16),
+            alive=np.zeros(MAX_FOOD, dtype=bool),
         )
 
-    def draw(self, screen):
-        pygame.draw.circle(screen, self.color, (self.x, self.y), self.radius)
+    def spawn(self, n):
+        """Fill up to n free slots with freshly rolled pellets in one
+        batched RNG pass."""
+        free = np.nonzero(~self.alive)[0][:n]
+        if free.size == 0:
+            return
+        k = free.size
+        self.x[free] = rng.integers(0, SCREEN_WIDTH + 1, k)
+        self.y[free] = rng.integers(0, SCREEN_HEIGHT + 1, k)
+        self.color_id[free] = rng.integers(0, len(FOOD_PALETTE), k)
+        self.alive[free] = True
+
+
+# Pre-rasterized pellet surfaces keyed by palette index, so drawing
+# food is a batch of blits instead of per-pellet circle rasterization
+_food_sprite_cache = {}
+
+def get_food_sprite(color_id):
+    sprite = _food_sprite_cache.get(color_id)
+    if sprite is None:
+        size = 2 * FOOD_RADIUS + 1
+        sprite = pygame.Surface((size, size), pygame.SRCALPHA)
+        pygame.draw.circle(sprite, FOOD_PALETTE[color_id],
+                           (FOOD_RADIUS, FOOD_RADIUS), FOOD_RADIUS)
+        _food_sprite_cache[color_id] = sprite
+    return sprite
+
+
+# --- Collision Resolution ---
+def eat_food(players, food):
+    """Vectorized player-vs-food pass over the SoA arrays.
+
+    Returns True if any pellet was eaten (i.e. a mass changed)."""
+    live_p = np.nonzero(players.alive)[0]
+    live_f = np.nonzero(food.alive)[0]
+    if live_p.size == 0 or live_f.size == 0:
+        return False
+
+    dx = food.x[live_f][None, :] - players.x[live_p][:, None]
+    dy = food.y[live_f][None, :] - players.y[live_p][:, None]
+    reach = (players.radius[live_p][:, None] + FOOD_RADIUS).astype(np.float32)
+    hit = dx * dx + dy * dy < reach * reach
+
+    hit_any = hit.any(axis=0)
+    if not hit_any.any():
+        return False
+
+    # Award each pellet to the first player whose circle covers it
+    eaters = live_p[hit.argmax(axis=0)[hit_any]]
+    np.add.at(players.mass, eaters, FOOD_MASS)
+    food.alive[live_f[hit_any]] = False
+    players.update_properties(np.unique(eaters))
+    return True
+
+
+def resolve_player_collisions(players):
+    """Run the collision kernel and recompute speeds for any eaters.
+
+    Returns True if any player was eaten (i.e. a mass changed)."""
+    live = np.nonzero(players.alive)[0]
+    if live.size < 2:
+        return False
+
+    # Cell size must stay >= 2x the largest radius for the 3x3
+    # neighborhood to cover every possible eat; the 32px floor keeps the
+    # grid from getting needlessly fine early on
+    cell = max(32, 2 * int(players.radius[live].max()))
+    changed = collide_players(players.x, players.y, players.mass,
+                              players.radius, players.alive, cell,
+                              SCREEN_WIDTH, SCREEN_HEIGHT, EAT_THRESHOLD)
+    if not changed.any():
+        return False
+    players.update_properties(np.nonzero(changed)[0])
+    return True
 
 # --- Main Game Function ---
 def main():
@@ -166,346 +357,426 @@ def main():
     pygame.display.set_caption("Agar.io AI Simulation")
     clock = pygame.time.Clock()
 
-    # Fonts
-    font_title = pygame.font.SysFont(None, 28, bold=True)
-    font_main = pygame.font.SysFont(None, 20, bold=True)
-    font_small = pygame.font.SysFont(None, 18)
-    font_large = pygame.font.SysFont(None, 100, bold=True)
-    font_medium = pygame.font.SysFont(None, 50)
-
-    players = []
-    food_pellets = []
-    colors = generate_distinct_colors(NUM_TEAMS)
-
-    # Initialize Players
-    for team_id in range(NUM_TEAMS):
-        color = colors[team_id]
-        for _ in range(PLAYERS_PER_TEAM):
-            x = random.randint(0, SCREEN_WIDTH)
-            y = random.randint(0, SCREEN_HEIGHT)
-            players.append(Player(x, y, team_id, color, START_MASS))
-
-    # Game State
-    game_state = "playing" # Can be "playing", "paused", "victory"
-    winning_team_data = None
-    
-    team_data = {}
-    sorted_teams = []
-    max_mass = 1
-    
-    # --- Time and FPS variables ---
-    total_play_time = 0  # Milliseconds
-    last_frame_ticks = pygame.time.get_ticks()
-    fps = 0
-    
-    # --- Game speed and input box variables ---
-    game_speed = 1.0
-    input_text = "1" 
-    input_active = False
+    # Only the event types the loop actually handles reach the queue;
+    # everything else (MOUSEMOTION in particular floods at mouse rate)
+    # is dropped at the SDL layer instead of drained in Python.
+    # MOUSEBUTTONDOWN stays allowed for the speed-input box.
+    pygame.event.set_blocked(None)
+    pygame.event.set_allowed([pygame.QUIT, pygame.KEYDOWN, pygame.MOUSEBUTTONDOWN])
+
+    # Fonts (cached at module level, so restarts reuse the loaded faces)
+    font_title = get_font(28, bold=True)
+    font_main = get_font(20, bold=True)
+    font_small = get_font(18)
+    font_large = get_font(100, bold=True)
+    font_medium = get_font(50)
+
+    # Dirty-rect bookkeeping: the playfield and the FPS/timer corner
+    # change every frame, but the scoreboard column only needs a display
+    # upload when its contents do
+    playfield_rect = pygame.Rect(0, 0, SCREEN_WIDTH, SCREEN_HEIGHT)
+    board_rect = pygame.Rect(SCREEN_WIDTH, 0, SCOREBOARD_WIDTH, SCREEN_HEIGHT)
+    hud_rect = pygame.Rect(TOTAL_WIDTH - 130, 5, 125, 45)
+
+    # Shared pause/victory overlay, allocated and filled once
+    overlay = pygame.Surface((TOTAL_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
+    overlay.fill(VICTORY_OVERLAY_COLOR)
+
+    # Pre-rendered background strip for the leaderboard bars
+    bar_bg = pygame.Surface((SCOREBOARD_WIDTH - 20, 10))
+    bar_bg.fill(BAR_BG_COLOR)
+
     input_box_rect = pygame.Rect(SCREEN_WIDTH + 10, SCREEN_HEIGHT - 40, SCOREBOARD_WIDTH - 20, 30)
-    # --- Cursor variables ---
-    cursor_pos = len(input_text)
-    cursor_timer = 0
-    cursor_visible = True
-    
+
     running = True
+    restart = True
     try:
-        while running:
-            # --- Delta time calculation ---
-            current_ticks = pygame.time.get_ticks()
-            dt_ms = current_ticks - last_frame_ticks
-            last_frame_ticks = current_ticks
-
-            # --- Update cursor blink timer ---
-            if input_active:
-                cursor_timer += dt_ms
-                if cursor_timer >= CURSOR_BLINK_RATE:
-                    cursor_timer = 0
-                    cursor_visible = not cursor_visible
-
-            # --- Event Handling (Runs in all states) ---
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    running = False
-                
-                # --- Handle clicking on/off the input box ---
-                if event.type == pygame.MOUSEBUTTONDOWN:
-                    if input_box_rect.collidepoint(event.pos):
-                        input_active = True
-                        # --- Set cursor position based on click ---
-                        cursor_pos = get_cursor_pos_from_click(font_small, input_text, event.pos[0], input_box_rect.x + 5)
+        while restart:
+            # --- Per-round state (re-initialized in place when 'R' restarts) ---
+            restart = False
+
+            players = PlayerState.spawn()
+            food = FoodState.empty()
+
+            # Reused each frame (clear-and-fill) to avoid per-frame list churn
+            food_batch = []
+            player_batch = []
+
+            # Mass-sorted draw order, refreshed only on eat events
+            draw_order = np.argsort(players.mass, kind="stable")
+            draw_order_dirty = False
+
+            # True once the current paused frame is already on screen
+            paused_frame_shown = False
+            last_board_key = None
+
+            # Scene snapshot captured when the round ends, so the victory
+            # screen stops redrawing food/players/scoreboard every frame
+            frozen_frame = None
+
+            # Per-team scoreboard surfaces, rebuilt only when the numbers change
+            board_cache = {}  # team_id -> (key, team_surface, mass_surface)
+
+            # Game State
+            game_state = "playing" # Can be "playing", "paused", "victory"
+            winning_team_data = None
+
+            team_mass = np.zeros(NUM_TEAMS)
+            team_count = np.zeros(NUM_TEAMS, dtype=np.int64)
+            sorted_teams = np.arange(NUM_TEAMS)
+            max_mass = 1
+
+            # --- Time and FPS variables ---
+            total_play_time = 0  # Milliseconds
+            last_frame_ticks = pygame.time.get_ticks()
+            fps = 0
+
+            # --- Game speed and input box variables ---
+            game_speed = 1.0
+            input_text = "1"
+            input_active = False
+            # --- Cursor variables ---
+            cursor_pos = len(input_text)
+            cursor_timer = 0
+            cursor_visible = True
+
+            while running and not restart:
+                # --- Delta time calculation ---
+                current_ticks = pygame.time.get_ticks()
+                dt_ms = current_ticks - last_frame_ticks
+                last_frame_ticks = current_ticks
+
+                # --- Update cursor blink timer ---
+                if input_active:
+                    cursor_timer += dt_ms
+                    if cursor_timer >= CURSOR_BLINK_RATE:
                         cursor_timer = 0
-                        cursor_visible = True
-                    else:
-                        if input_active:
-                            # User clicked away, parse the input
-                            game_speed, input_text = parse_speed_input(input_text)
-                            cursor_pos = len(input_text) # Move cursor to end
-                        input_active = False
-
-                if event.type == pygame.KEYDOWN:
-                    # Global key presses (work in any game state)
-                    if event.key == pygame.K_q:
-                        running = False
-                    if event.key == pygame.K_r:
-                        main()  # Restart
-                        return
-                    
-                    # --- Handle input box typing ---
-                    if input_active:
-                        # Reset cursor blink on any keypress
-                        cursor_timer = 0
-                        cursor_visible = True
+                        cursor_visible = not cursor_visible
 
-                        if event.key == pygame.K_RETURN:
-                            game_speed, input_text = parse_speed_input(input_text)
-                            input_active = False
-                            cursor_pos = len(input_text)
-                        elif event.key == pygame.K_BACKSPACE:
-                            if cursor_pos > 0:
-                                input_text = input_text[:cursor_pos-1] + input_text[cursor_pos:]
-                                cursor_pos -= 1
-                        elif event.key == pygame.K_DELETE:
-                            input_text = input_text[:cursor_pos] + input_text[cursor_pos+1:]
-                        elif event.key == pygame.K_LEFT:
-                            cursor_pos = max(0, cursor_pos - 1)
-                        elif event.key == pygame.K_RIGHT:
-                            cursor_pos = min(len(input_text), cursor_pos + 1)
-                        else:
-                            # Add typed character if it's valid
-                            char = event.unicode
-                            if char.isdigit() or (char == '.' and '.' not in input_text):
-                                input_text = input_text[:cursor_pos] + char + input_text[cursor_pos:]
-                                cursor_pos += 1
-                    else:
-                        # Only handle pause key if NOT typing
-                        if event.key == pygame.K_p:
-                            # Toggle pause state
-                            if game_state == "playing":
-                                game_state = "paused"
-                            elif game_state == "paused":
-                                game_state = "playing"
-
-
-            # --- Game State Logic (Only if playing) ---
-            if game_state == "playing":
-                # Apply game_speed to active play time
-                total_play_time += dt_ms * game_speed
-
-                # Apply game_speed to food spawn rate
-                if random.random() < (FOOD_SPAWN_RATE * game_speed) and len(food_pellets) < MAX_FOOD:
-                    fx = random.randint(0, SCREEN_WIDTH)
-                    fy = random.randint(0, SCREEN_HEIGHT)
-                    food_pellets.append(Food(fx, fy))
-
-                # Pass game_speed to player move
-                for player in players:
-                    player.move(game_speed)
-
-                # 3. Handle food collisions
-                for player in players:
-                    for pellet in food_pellets.copy():
-                        dist = get_distance(player.x, player.y, pellet.x, pellet.y)
-                        if dist < player.radius + pellet.radius:
-                            player.mass += FOOD_MASS
-                            player.update_properties()
-                            food_pellets.remove(pellet)
-
-                # 4. Handle player collisions
-                for player_a in players.copy():
-                    for player_b in players.copy():
-                        if player_a not in players or player_b not in players:
-                            continue
-                        if player_a == player_b: 
-                            continue
-                            
-                        dist = get_distance(player_a.x, player_a.y, player_b.x, player_b.y)
-
-                        if player_a.mass > player_b.mass * EAT_THRESHOLD:
-                            if dist + player_b.radius < player_a.radius:
-                                player_a.mass += player_b.mass
-                                player_a.update_properties()
-                                players.remove(player_b)
-                        
-                        elif player_b.mass > player_a.mass * EAT_THRESHOLD:
-                            if dist + player_a.radius < player_b.radius:
-                                player_b.mass += player_a.mass
-                                player_b.update_properties()
-                                players.remove(player_a)
-                                
-                # --- Scoreboard Data Calculation ---
-                team_data = {}
-                for i in range(NUM_TEAMS):
-                    team_data[i] = {'mass': 0, 'player_count': 0, 'color': tuple(colors[i])}
-
-                for player in players:
-                    team_data[player.team_id]['mass'] += player.mass
-                    team_data[player.team_id]['player_count'] += 1
-                
-                max_mass = max(1, *[data['mass'] for data in team_data.values()])
-                sorted_teams = sorted(team_data.items(), key=lambda item: item[1]['mass'], reverse=True)
-
-                # --- Win Condition Check ---
-                active_team_count = 0
-                last_active_team_id = -1
-                for team_id, data in team_data.items():
-                    if data['player_count'] > 0:
-                        active_team_count += 1
-                        last_active_team_id = team_id
+                # --- Event Handling (Runs in all states) ---
+                for event in pygame.event.get():
+                    # Any event can change what's on screen (pause toggle,
+                    # input box focus/typing), so force a redraw
+                    paused_frame_shown = False
+                    frozen_frame = None
+
+                    if event.type == pygame.QUIT:
+                        running = False
                 
-                if active_team_count == 1:
-                    game_state = "victory"
-                    winning_team_data = team_data[last_active_team_id]
-                    winning_team_data['id'] = last_active_team_id
-                elif active_team_count == 0:
-                    game_state = "victory"
-                    winning_team_data = {'id': 'No one', 'color': (200, 200, 200), 'mass': 0}
+                    # --- Handle clicking on/off the input box ---
+                    if event.type == pygame.MOUSEBUTTONDOWN:
+                        if input_box_rect.collidepoint(event.pos):
+                            input_active = True
+                            # --- Set cursor position based on click ---
+                            cursor_pos = get_cursor_pos_from_click(font_small, input_text, event.pos[0], input_box_rect.x + 5)
+                            cursor_timer = 0
+                            cursor_visible = True
+                        else:
+                            if input_active:
+                                # User clicked away, parse the input
+                                game_speed, input_text = parse_speed_input(input_text)
+                                cursor_pos = len(input_text) # Move cursor to end
+                            input_active = False
 
+                    if event.type == pygame.KEYDOWN:
+                        # Global key presses (work in any game state)
+                        if event.key == pygame.K_q:
+                            running = False
+                        if event.key == pygame.K_r:
+                            restart = True  # Reset the round in place
+                    
+                        # --- Handle input box typing ---
+                        if input_active:
+                            # Reset cursor blink on any keypress
+                            cursor_timer = 0
+                            cursor_visible = True
+
+                            if event.key == pygame.K_RETURN:
+                                game_speed, input_text = parse_speed_input(input_text)
+                                input_active = False
+                                cursor_pos = len(input_text)
+                            elif event.key == pygame.K_BACKSPACE:
+                                if cursor_pos > 0:
+                                    input_text = input_text[:cursor_pos-1] + input_text[cursor_pos:]
+                                    cursor_pos -= 1
+                            elif event.key == pygame.K_DELETE:
+                                input_text = input_text[:cursor_pos] + input_text[cursor_pos+1:]
+                            elif event.key == pygame.K_LEFT:
+                                cursor_pos = max(0, cursor_pos - 1)
+                            elif event.key == pygame.K_RIGHT:
+                                cursor_pos = min(len(input_text), cursor_pos + 1)
+                            else:
+                                # Add typed character if it's valid
+                                char = event.unicode
+                                if char.isdigit() or (char == '.' and '.' not in input_text):
+                                    input_text = input_text[:cursor_pos] + char + input_text[cursor_pos:]
+                                    cursor_pos += 1
+                        else:
+                            # Only handle pause key if NOT typing
+                            if event.key == pygame.K_p:
+                                # Toggle pause state
+                                if game_state == "playing":
+                                    game_state = "paused"
+                                elif game_state == "paused":
+                                    game_state = "playing"
+
+
+                # --- Paused short-circuit ---
+                # The paused scene is static: once its frame is on screen,
+                # skip the whole draw pass. The input box is the exception,
+                # since its cursor keeps blinking while focused.
+                if game_state == "paused" and paused_frame_shown and not input_active:
+                    clock.tick(60)
+                    fps = clock.get_fps()
+                    continue
 
-            # --- Drawing (Runs in ALL states) ---
-            screen.fill(BACKGROUND_COLOR)
+                # --- Game State Logic (Only if playing) ---
+                if game_state == "playing":
+                    # Apply game_speed to active play time
+                    total_play_time += dt_ms * game_speed
+
+                    # Apply game_speed to food spawn rate: draw this frame's
+                    # spawn count in one go (same expected rate as the old
+                    # one-pellet-per-frame Bernoulli, but it keeps up when
+                    # game_speed pushes the rate past 1/frame)
+                    n_new = rng.poisson(FOOD_SPAWN_RATE * game_speed)
+                    if n_new:
+                        food.spawn(n_new)
+
+                    # Pass game_speed to the vectorized player move
+                    players.move(game_speed)
+
+                    # 3. Handle food collisions
+                    if eat_food(players, food):
+                        draw_order_dirty = True
+
+                    # 4. Handle player collisions
+                    if resolve_player_collisions(players):
+                        draw_order_dirty = True
+
+                    # --- Scoreboard Data Calculation ---
+                    live_ids = players.team_id[players.alive]
+                    team_mass = np.bincount(live_ids, weights=players.mass[players.alive],
+                                            minlength=NUM_TEAMS)
+                    team_count = np.bincount(live_ids, minlength=NUM_TEAMS)
+                    max_mass = max(1, int(team_mass.max()))
+                    sorted_teams = np.argsort(-team_mass)
+
+                    # --- Win Condition Check ---
+                    active = np.nonzero(team_count > 0)[0]
+                    if active.size == 1:
+                        tid = int(active[0])
+                        game_state = "victory"
+                        winning_team_data = {'id': tid, 'color': TEAM_COLORS[tid],
+                                             'mass': float(team_mass[tid])}
+                    elif active.size == 0:
+                        game_state = "victory"
+                        winning_team_data = {'id': 'No one', 'color': (200, 200, 200), 'mass': 0}
+
+
+                # --- Drawing (Runs in ALL states) ---
+                if game_state == "victory" and frozen_frame is not None:
+                    # The end-of-game scene is static; reuse the frame
+                    # captured on the victory transition instead of
+                    # redrawing food, players and the scoreboard.
+                    screen.blit(frozen_frame, (0, 0))
+                else:
+                    screen.fill(BACKGROUND_COLOR)
             
-            for pellet in food_pellets:
-                pellet.draw(screen)
-                
-            for player in sorted(players, key=lambda p: p.mass):
-                player.draw(screen)
+                    food_batch.clear()
+                    for i in np.nonzero(food.alive)[0]:
+                        sprite = get_food_sprite(int(food.color_id[i]))
+                        food_batch.append((sprite, (int(food.x[i]) - FOOD_RADIUS,
+                                                    int(food.y[i]) - FOOD_RADIUS)))
+                    screen.blits(food_batch)
+
+                    # Draw smallest-first so bigger players cover smaller ones.
+                    # Masses only change on eat events, so the sort order is
+                    # cached and recomputed only when flagged dirty.
+                    if draw_order_dirty:
+                        draw_order = np.argsort(players.mass, kind="stable")
+                        draw_order_dirty = False
+                    # Cull dead, zero-radius and (after any future viewport
+                    # change) off-screen players in one vectorized mask before
+                    # touching the rasterizer.
+                    visible = (players.alive & (players.radius > 0)
+                               & (players.x + players.radius >= 0)
+                               & (players.x - players.radius < SCREEN_WIDTH)
+                               & (players.y + players.radius >= 0)
+                               & (players.y - players.radius < SCREEN_HEIGHT))
+                    player_batch.clear()
+                    for i in draw_order[visible[draw_order]]:
+                        r = int(players.radius[i])
+                        sprite = get_player_sprite(int(players.team_id[i]), r)
+                        player_batch.append((sprite, (int(players.x[i]) - r,
+                                                      int(players.y[i]) - r)))
+                    screen.blits(player_batch)
                 
-            # --- Draw Scoreboard ---
-            scoreboard_rect = pygame.Rect(SCREEN_WIDTH, 0, SCOREBOARD_WIDTH, SCREEN_HEIGHT)
-            pygame.draw.rect(screen, SCOREBOARD_BG_COLOR, scoreboard_rect)
-            pygame.draw.line(screen, DIVIDER_COLOR, (SCREEN_WIDTH, 0), (SCREEN_WIDTH, SCREEN_HEIGHT), 2)
+                    # --- Draw Scoreboard ---
+                    scoreboard_rect = pygame.Rect(SCREEN_WIDTH, 0, SCOREBOARD_WIDTH, SCREEN_HEIGHT)
+                    pygame.draw.rect(screen, SCOREBOARD_BG_COLOR, scoreboard_rect)
+                    pygame.draw.line(screen, DIVIDER_COLOR, (SCREEN_WIDTH, 0), (SCREEN_WIDTH, SCREEN_HEIGHT), 2)
             
-            title_surface = font_title.render("Leaderboard", True, TEXT_COLOR_LIGHT)
-            screen.blit(title_surface, (SCREEN_WIDTH + (SCOREBOARD_WIDTH - title_surface.get_width()) // 2, 50))
+                    title_surface = render_text(font_title, "Leaderboard", TEXT_COLOR_LIGHT)
+                    screen.blit(title_surface, (SCREEN_WIDTH + (SCOREBOARD_WIDTH - title_surface.get_width()) // 2, 50))
             
-            y_offset = 80 
-            bar_max_width = SCOREBOARD_WIDTH - 20
-            bar_height = 10
-            entry_height = 55
-            
-            for i, (team_id, data) in enumerate(sorted_teams):
-                if data['player_count'] == 0 and data['mass'] == 0:
-                    continue
-                    
-                current_y = y_offset + i * entry_height
-                color = data['color']
-                
-                team_text = f"Team {team_id} ({data['player_count']} players)"
-                team_surface = font_main.render(team_text, True, color)
-                screen.blit(team_surface, (SCREEN_WIDTH + 10, current_y))
-                
-                mass_text = f"Mass: {data['mass']:,.0f}"
-                mass_surface = font_small.render(mass_text, True, TEXT_COLOR_MUTED)
-                screen.blit(mass_surface, (SCREEN_WIDTH + 10, current_y + 20))
-                
-                bar_width_proportional = (data['mass'] / max_mass) * bar_max_width
-                
-                pygame.draw.rect(screen, BAR_BG_COLOR, (SCREEN_WIDTH + 10, current_y + 40, bar_max_width, bar_height))
-                pygame.draw.rect(screen, color, (SCREEN_WIDTH + 10, current_y + 40, bar_width_proportional, bar_height))
+                    y_offset = 80 
+                    bar_max_width = SCOREBOARD_WIDTH - 20
+                    bar_height = 10
+                    entry_height = 55
             
+                    for i, team_id in enumerate(sorted_teams):
+                        team_id = int(team_id)
+                        count = int(team_count[team_id])
+                        mass = float(team_mass[team_id])
+                        if count == 0 and mass == 0:
+                            continue
 
-            # --- Draw Game Speed Input Box ---
-            label_surf = font_small.render("Game Speed (x):", True, TEXT_COLOR_MUTED)
-            screen.blit(label_surf, (input_box_rect.x, input_box_rect.y - 18))
-            
-            box_color = TEXT_COLOR_LIGHT if input_active else TEXT_COLOR_MUTED
-            pygame.draw.rect(screen, box_color, input_box_rect, 2)
+                        current_y = y_offset + i * entry_height
+                        color = TEAM_COLORS[team_id]
+
+                        # Mass only changes on eat events, so between eats the
+                        # cached surfaces are reused without even formatting the
+                        # strings
+                        key = (count, round(mass))
+                        cached = board_cache.get(team_id)
+                        if cached is None or cached[0] != key:
+                            team_text = f"Team {team_id} ({count} players)"
+                            team_surface = render_text(font_main, team_text, color)
+                            mass_text = f"Mass: {mass:,.0f}"
+                            mass_surface = render_text(font_small, mass_text, TEXT_COLOR_MUTED)
+                            board_cache[team_id] = (key, team_surface, mass_surface)
+                        else:
+                            team_surface, mass_surface = cached[1], cached[2]
+
+                        screen.blit(team_surface, (SCREEN_WIDTH + 10, current_y))
+                        screen.blit(mass_surface, (SCREEN_WIDTH + 10, current_y + 20))
+
+                        bar_width_proportional = int((mass / max_mass) * bar_max_width)
+
+                        # Blit the prebuilt background strip; the colored fill
+                        # goes through screen.fill, which takes SDL's fast
+                        # FillRect path for opaque colors
+                        screen.blit(bar_bg, (SCREEN_WIDTH + 10, current_y + 40))
+                        if bar_width_proportional > 0:
+                            screen.fill(color, (SCREEN_WIDTH + 10, current_y + 40,
+                                                bar_width_proportional, bar_height))
             
-            text_surface = font_small.render(input_text, True, TEXT_COLOR_LIGHT)
-            screen.blit(text_surface, (input_box_rect.x + 5, input_box_rect.y + 7))
-
-            # --- Draw the cursor ---
-            if input_active and cursor_visible:
-                # Calculate cursor x position
-                cursor_x_offset = font_small.size(input_text[:cursor_pos])[0]
-                cursor_x = input_box_rect.x + 5 + cursor_x_offset
-                cursor_y_start = input_box_rect.y + 5
-                cursor_y_end = input_box_rect.y + input_box_rect.height - 5
-                pygame.draw.line(screen, TEXT_COLOR_LIGHT, (cursor_x, cursor_y_start), (cursor_x, cursor_y_end), 2)
 
+                    # --- Draw Game Speed Input Box ---
+                    label_surf = render_text(font_small, "Game Speed (x):", TEXT_COLOR_MUTED)
+                    screen.blit(label_surf, (input_box_rect.x, input_box_rect.y - 18))
             
-            # --- Overlays (Pause or Victory) ---
-            if game_state == "victory":
-                overlay = pygame.Surface((TOTAL_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
-                overlay.fill(VICTORY_OVERLAY_COLOR)
-                screen.blit(overlay, (0, 0))
+                    box_color = TEXT_COLOR_LIGHT if input_active else TEXT_COLOR_MUTED
+                    pygame.draw.rect(screen, box_color, input_box_rect, 2)
+            
+                    text_surface = render_text(font_small, input_text, TEXT_COLOR_LIGHT)
+                    screen.blit(text_surface, (input_box_rect.x + 5, input_box_rect.y + 7))
+
+                    # --- Draw the cursor ---
+                    if input_active and cursor_visible:
+                        # Calculate cursor x position
+                        cursor_x_offset = font_small.size(input_text[:cursor_pos])[0]
+                        cursor_x = input_box_rect.x + 5 + cursor_x_offset
+                        cursor_y_start = input_box_rect.y + 5
+                        cursor_y_end = input_box_rect.y + input_box_rect.height - 5
+                        pygame.draw.line(screen, TEXT_COLOR_LIGHT, (cursor_x, cursor_y_start), (cursor_x, cursor_y_end), 2)
+
+                    if game_state == "victory":
+                        frozen_frame = screen.copy()
+
+                # --- Overlays (Pause or Victory) ---
+                if game_state == "victory":
+                    screen.blit(overlay, (0, 0))
                 
-                win_color = winning_team_data['color']
-                win_id = winning_team_data['id']
-                win_mass = winning_team_data['mass']
+                    win_color = winning_team_data['color']
+                    win_id = winning_team_data['id']
+                    win_mass = winning_team_data['mass']
                 
-                title_text = "VICTORY!" if win_id != 'No one' else "DRAW!"
-                title_surf = font_large.render(title_text, True, win_color)
-                title_rect = title_surf.get_rect(center=(TOTAL_WIDTH / 2, SCREEN_HEIGHT / 2 - 80))
-                screen.blit(title_surf, title_rect)
-
-                if win_id != 'No one':
-                    team_surf = font_medium.render(f"Team {win_id} Wins!", True, TEXT_COLOR_LIGHT)
-                    team_rect = team_surf.get_rect(center=(TOTAL_WIDTH / 2, SCREEN_HEIGHT / 2))
-                    screen.blit(team_surf, team_rect)
+                    title_text = "VICTORY!" if win_id != 'No one' else "DRAW!"
+                    title_surf = render_text(font_large, title_text, win_color)
+                    title_rect = title_surf.get_rect(center=(TOTAL_WIDTH / 2, SCREEN_HEIGHT / 2 - 80))
+                    screen.blit(title_surf, title_rect)
+
+                    if win_id != 'No one':
+                        team_surf = render_text(font_medium, f"Team {win_id} Wins!", TEXT_COLOR_LIGHT)
+                        team_rect = team_surf.get_rect(center=(TOTAL_WIDTH / 2, SCREEN_HEIGHT / 2))
+                        screen.blit(team_surf, team_rect)
                 
-                    mass_surf = font_medium.render(f"Final Mass: {win_mass:,.0f}", True, TEXT_COLOR_MUTED)
-                    mass_rect = mass_surf.get_rect(center=(TOTAL_WIDTH / 2, SCREEN_HEIGHT / 2 + 50))
-                    screen.blit(mass_surf, mass_rect)
-
-                    # --- Victory time formatting to show MM:SS.s ---
-                    total_play_seconds_float_win = total_play_time / 1000.0
-                    minutes_win = int(total_play_seconds_float_win) // 60
-                    seconds_with_decimal_win = total_play_seconds_float_win % 60
-                    # Use :04.1f for seconds to get format like 07.1
-                    time_win_str = f"Final Time: {minutes_win:02}:{seconds_with_decimal_win:04.1f}"
+                        mass_surf = render_text(font_medium, f"Final Mass: {win_mass:,.0f}", TEXT_COLOR_MUTED)
+                        mass_rect = mass_surf.get_rect(center=(TOTAL_WIDTH / 2, SCREEN_HEIGHT / 2 + 50))
+                        screen.blit(mass_surf, mass_rect)
+
+                        # --- Victory time formatting to show MM:SS.s ---
+                        total_play_seconds_float_win = total_play_time / 1000.0
+                        minutes_win = int(total_play_seconds_float_win) // 60
+                        seconds_with_decimal_win = total_play_seconds_float_win % 60
+                        # Use :04.1f for seconds to get format like 07.1
+                        time_win_str = f"Final Time: {minutes_win:02}:{seconds_with_decimal_win:04.1f}"
                     
-                    time_surf = font_medium.render(time_win_str, True, TEXT_COLOR_MUTED)
-                    time_rect = time_surf.get_rect(center=(TOTAL_WIDTH / 2, SCREEN_HEIGHT / 2 + 100))
-                    screen.blit(time_surf, time_rect)
+                        time_surf = render_text(font_medium, time_win_str, TEXT_COLOR_MUTED)
+                        time_rect = time_surf.get_rect(center=(TOTAL_WIDTH / 2, SCREEN_HEIGHT / 2 + 100))
+                        screen.blit(time_surf, time_rect)
                 
-                prompt_surf = font_main.render("Press 'R' to Restart or 'Q' to Quit", True, TEXT_COLOR_LIGHT)
-                prompt_rect = prompt_surf.get_rect(center=(TOTAL_WIDTH / 2, SCREEN_HEIGHT / 2 + 150))
-                screen.blit(prompt_surf, prompt_rect)
-
-            elif game_state == "paused":
-                overlay = pygame.Surface((TOTAL_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
-                overlay.fill(VICTORY_OVERLAY_COLOR) 
-                screen.blit(overlay, (0, 0))
+                    prompt_surf = render_text(font_main, "Press 'R' to Restart or 'Q' to Quit", TEXT_COLOR_LIGHT)
+                    prompt_rect = prompt_surf.get_rect(center=(TOTAL_WIDTH / 2, SCREEN_HEIGHT / 2 + 150))
+                    screen.blit(prompt_surf, prompt_rect)
+
+                elif game_state == "paused":
+                    screen.blit(overlay, (0, 0))
                 
-                pause_surf = font_large.render("PAUSED", True, TEXT_COLOR_LIGHT)
-                pause_rect = pause_surf.get_rect(center=(TOTAL_WIDTH / 2, SCREEN_HEIGHT / 2 - 40))
-                screen.blit(pause_surf, pause_rect)
+                    pause_surf = render_text(font_large, "PAUSED", TEXT_COLOR_LIGHT)
+                    pause_rect = pause_surf.get_rect(center=(TOTAL_WIDTH / 2, SCREEN_HEIGHT / 2 - 40))
+                    screen.blit(pause_surf, pause_rect)
                 
-                prompt_surf = font_main.render("Press 'P' to Resume", True, TEXT_COLOR_LIGHT)
-                prompt_rect = prompt_surf.get_rect(center=(TOTAL_WIDTH / 2, SCREEN_HEIGHT / 2 + 40))
-                screen.blit(prompt_surf, prompt_rect)
+                    prompt_surf = render_text(font_main, "Press 'P' to Resume", TEXT_COLOR_LIGHT)
+                    prompt_rect = prompt_surf.get_rect(center=(TOTAL_WIDTH / 2, SCREEN_HEIGHT / 2 + 40))
+                    screen.blit(prompt_surf, prompt_rect)
 
-            # --- Draw FPS and Timer on top of everything ---
+                # --- Draw FPS and Timer on top of everything ---
             
-            # FPS formatting to 1 decimal place
-            fps_text = f"FPS: {fps:.1f}"
-            fps_surf = font_small.render(fps_text, True, TEXT_COLOR_MUTED)
-            fps_rect = fps_surf.get_rect(topright=(TOTAL_WIDTH - 10, 10))
-            screen.blit(fps_surf, fps_rect)
+                # Quantize to whole FPS so the rendered string (and its cache
+                # entry) only changes when the displayed value does
+                fps_text = f"FPS: {fps:.0f}"
+                fps_surf = render_text(font_small, fps_text, TEXT_COLOR_MUTED)
+                fps_rect = fps_surf.get_rect(topright=(TOTAL_WIDTH - 10, 10))
+                screen.blit(fps_surf, fps_rect)
             
-            # --- Timer formatting to show MM:SS.s ---
-            total_play_seconds_float = total_play_time / 1000.0
-            minutes = int(total_play_seconds_float) // 60
-            seconds_with_decimal = total_play_seconds_float % 60
+                # --- Timer formatting to show MM:SS.s ---
+                total_play_seconds_float = total_play_time / 1000.0
+                minutes = int(total_play_seconds_float) // 60
+                seconds_with_decimal = total_play_seconds_float % 60
             
-            # Use :04.1f for seconds to get format like 07.1 or 12.3
-            time_str = f"Time: {int(minutes):02}:{seconds_with_decimal:04.1f}"
+                # Use :04.1f for seconds to get format like 07.1 or 12.3
+                time_str = f"Time: {int(minutes):02}:{seconds_with_decimal:04.1f}"
             
-            time_surf = font_small.render(time_str, True, TEXT_COLOR_MUTED)
-            time_rect = time_surf.get_rect(topright=(TOTAL_WIDTH - 10, 30))
-            screen.blit(time_surf, time_rect)
-
-
-            # Update the display
-            pygame.display.flip()
-
-            # Cap the framerate
-            clock.tick(60)
+                time_surf = render_text(font_small, time_str, TEXT_COLOR_MUTED)
+                time_rect = time_surf.get_rect(topright=(TOTAL_WIDTH - 10, 30))
+                screen.blit(time_surf, time_rect)
+
+
+                # Update the display. While playing, only upload the regions
+                # that changed; the pause/victory overlays cover the whole
+                # window, so those states still flip everything.
+                if game_state == "playing":
+                    dirty = [playfield_rect, hud_rect]
+                    board_key = (sorted_teams.tobytes(), team_count.tobytes(),
+                                 np.round(team_mass).tobytes(),
+                                 input_text, input_active, cursor_pos, cursor_visible)
+                    if board_key != last_board_key:
+                        last_board_key = board_key
+                        dirty.append(board_rect)
+                    pygame.display.update(dirty)
+                else:
+                    pygame.display.flip()
+                    last_board_key = None
+                paused_frame_shown = (game_state == "paused")
+
+                # Cap the framerate
+                clock.tick(60)
             
-            # Get FPS for next frame's draw
-            fps = clock.get_fps()
+                # Get FPS for next frame's draw
+                fps = clock.get_fps()
             
     finally:
         pygame.quit()